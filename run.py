@@ -1,15 +1,141 @@
 #!/usr/bin/env python3
-"""MCP AKShare 服务入口"""
+"""
+MCP AKShare 服务入口
+
+默认在当前进程内直接运行服务。
+设置 AKSHARE_DAEMON=1 且无参数 (stdio) 时作为轻量转发器: 把 stdin/stdout 转发到 Unix socket 上的常驻服务，
+常驻服务不存在时自动启动，注册表和缓存在多个会话间共享；常驻服务空闲一段时间后自动退出。
+只连接属于当前用户的 socket，常驻服务无法启动时退回进程内运行。
+"""
 import sys
 import os
+import socket
+import stat
+import struct
+import subprocess
+import tempfile
+import threading
+import time
 
-# 添加 src 目录到 Python 路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src")
 
-# 确保模块可以导入
-os.chdir(os.path.dirname(__file__))
+# 等待新启动的常驻服务就绪的最长时间 (秒)
+DAEMON_START_TIMEOUT = 30
 
-from mcp_akshare.server import main
 
-if __name__ == "__main__":
+def _socket_path():
+    """与 mcp_akshare.server_daemon.default_socket_path 保持一致"""
+    env_path = os.environ.get('AKSHARE_SOCKET')
+    if env_path:
+        return env_path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'mcp_akshare', 'daemon.sock')
+    return os.path.join(tempfile.gettempdir(), f'mcp_akshare-{os.getuid()}', 'daemon.sock')
+
+
+def _try_connect(path):
+    """连接属于当前用户的常驻服务 socket，与 server_daemon 的属主检查保持一致"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        if hasattr(socket, 'SO_PEERCRED'):
+            creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+            if struct.unpack('3i', creds)[1] != os.getuid():
+                sock.close()
+                return None
+        return sock
+    except OSError:
+        sock.close()
+        return None
+
+
+def _connect_daemon(path):
+    """连接常驻服务，不存在时启动并等待就绪"""
+    sock = _try_connect(path)
+    if sock is not None:
+        return sock
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")]))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "mcp_akshare.server_daemon", "--socket", path],
+        cwd=os.path.dirname(SRC_DIR),
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.monotonic() + DAEMON_START_TIMEOUT
+    while time.monotonic() < deadline:
+        sock = _try_connect(path)
+        if sock is not None:
+            return sock
+        # 非 0 退出表示无法启动 (目录不安全、fastmcp 不兼容等)，不再等待；
+        # 0 表示另一个常驻服务抢先启动，继续等它就绪
+        if proc.poll():
+            return None
+        time.sleep(0.05)
+    return None
+
+
+def _pump_stdin(sock):
+    """stdin -> socket，stdin 结束时半关闭写端通知服务端"""
+    fd = sys.stdin.fileno()
+    try:
+        while True:
+            data = os.read(fd, 65536)
+            if not data:
+                break
+            sock.sendall(data)
+    except OSError:
+        pass
+    finally:
+        try:
+            sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+
+def _proxy(sock):
+    """双向转发，直到服务端关闭连接"""
+    threading.Thread(target=_pump_stdin, args=(sock,), daemon=True).start()
+    fd = sys.stdout.fileno()
+    with sock:
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            while data:
+                data = data[os.write(fd, data):]
+
+
+def _run_in_process():
+    sys.path.insert(0, SRC_DIR)
+    # 确保模块可以导入
+    os.chdir(os.path.dirname(SRC_DIR))
+
+    from mcp_akshare.server import main
     main()
+
+
+if __name__ == "__main__":
+    use_daemon = (
+        len(sys.argv) == 1
+        and hasattr(socket, "AF_UNIX")
+        and os.environ.get("AKSHARE_DAEMON") == "1"
+    )
+    sock = _connect_daemon(_socket_path()) if use_daemon else None
+    if sock is not None:
+        _proxy(sock)
+    else:
+        _run_in_process()
@@ -2,7 +2,14 @@
 MCP AKShare - akshare MCP 服务
 """
 
-from .server import mcp, main
-
 __version__ = "0.1.0"
 __all__ = ["mcp", "main"]
+
+
+def __getattr__(name):
+    # 服务模块 (fastmcp、各注册表初始化) 按需导入，
+    # 只使用 registry / formatters 时不付出启动服务的开销
+    if name in __all__:
+        from . import server
+        return getattr(server, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
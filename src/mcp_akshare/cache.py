@@ -0,0 +1,109 @@
+"""
+磁盘 TTL 缓存 - 跨进程复用 akshare 调用结果
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import time
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认最多保留的缓存文件数
+DEFAULT_MAX_ENTRIES = 256
+
+
+def user_cache_dir() -> str:
+    """用户缓存目录: AKSHARE_CACHE_DIR，否则 $XDG_CACHE_HOME/mcp_akshare 或 ~/.cache/mcp_akshare"""
+    return os.environ.get('AKSHARE_CACHE_DIR') or os.path.join(
+        os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'mcp_akshare')
+
+
+class FileCache:
+    """
+    以文件保存的 TTL 缓存，每个键一个 pickle 文件。
+
+    文件的修改时间设为过期时间，判断过期和清理只需 stat，不必读取内容。
+    过期或损坏的文件视为未命中并删除；写入后文件数超过 max_entries 时
+    删除过期文件，仍超出则删除最早过期的文件。
+    读写失败只记录日志，不影响调用方。
+    """
+
+    def __init__(self, directory: str, ttl: float, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f'{digest}.pkl')
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取未过期的值，未命中时返回 default"""
+        path = self._path(key)
+        try:
+            if os.stat(path).st_mtime < time.time():
+                _remove(path)
+                return default
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception as e:
+            logger.warning(f"读取调用缓存失败: {e}")
+            _remove(path)
+            return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入值，ttl 默认使用实例的 ttl"""
+        path = self._path(key)
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # 每次写入使用独立的临时文件，同一进程内多个线程并发写同一键互不干扰
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.directory)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=5)
+            os.utime(tmp_path, (expires_at, expires_at))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # 目录不可写或结果无法序列化
+            logger.warning(f"写入调用缓存失败: {e}")
+            if tmp_path is not None:
+                _remove(tmp_path)
+            return
+        self._prune()
+
+    def _prune(self):
+        """文件数超过 max_entries 时删除过期文件，仍超出则删除最早过期的"""
+        try:
+            with os.scandir(self.directory) as it:
+                entries = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith('.pkl')]
+        except OSError:
+            return
+        if len(entries) <= self.max_entries:
+            return
+
+        now = time.time()
+        live = []
+        for expires_at, path in entries:
+            if expires_at < now:
+                _remove(path)
+            else:
+                live.append((expires_at, path))
+
+        live.sort()
+        for _, path in live[:len(live) - self.max_entries]:
+            _remove(path)
+
+
+def _remove(path: str):
+    """删除文件，不存在或删除失败时忽略"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
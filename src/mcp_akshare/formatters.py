@@ -2,14 +2,56 @@
 响应格式化工具
 """
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 import json
-import pandas as pd
+import re
+import sys
+import orjson
 from datetime import date, datetime
 
+# pandas 延迟导入，见 _import_pd()
+pd = None
 
-def format_result(result: Any, max_rows: int = 100) -> Any:
-    """格式化函数返回值"""
+# 日期必然包含数字，用于快速排除纯文本列
+_HAS_DIGIT = re.compile(r'\d')
+
+
+def _import_pd():
+    """首次需要时导入 pandas，并注册 pandas 类型的格式化函数"""
+    global pd
+    if pd is None:
+        import pandas
+        pd = pandas
+        _DISPATCH[pd.DataFrame] = _format_dataframe
+        _DISPATCH[pd.Series] = _format_series
+    return pd
+
+
+def _is_pandas_loaded() -> bool:
+    """pandas 是否已被导入 (未导入时结果不可能是 pandas 对象)"""
+    if pd is None and 'pandas' in sys.modules:
+        _import_pd()
+    return pd is not None
+
+
+def _is_dataframe(value: Any) -> bool:
+    """判断是否为 DataFrame，不会为此导入 pandas"""
+    return _is_pandas_loaded() and isinstance(value, pd.DataFrame)
+
+
+def format_result(result: Any, max_rows: int = 100, parse_dates: bool = False,
+                  max_str_len: Optional[int] = None) -> Any:
+    """
+    格式化函数返回值
+
+    先截断再转换，超出部分不参与转换和序列化。
+
+    Args:
+        result: 函数返回值
+        max_rows: DataFrame 和列表最多保留的行数
+        parse_dates: 是否把看起来像日期的字符串列转换为日期，默认关闭
+        max_str_len: 字符串最大长度，超出部分截断，默认不截断
+    """
     if result is None:
         return {"message": "无数据"}
 
@@ -17,85 +59,197 @@ def format_result(result: Any, max_rows: int = 100) -> Any:
     if isinstance(result, dict) and "error" in result:
         return result
 
+    # 常见类型按精确类型直接分发
+    handler = _DISPATCH.get(type(result))
+    if handler is not None:
+        return handler(result, max_rows, parse_dates, max_str_len)
+
+    # 子类等其他情况逐个判断
     # DataFrame 转换
-    if isinstance(result, pd.DataFrame):
-        return _format_dataframe(result, max_rows)
+    if _is_dataframe(result):
+        return _format_dataframe(result, max_rows, parse_dates, max_str_len)
 
     # Series 转换
-    if isinstance(result, pd.Series):
-        return result.to_dict()
+    if _is_pandas_loaded() and isinstance(result, pd.Series):
+        return _format_series(result, max_rows, parse_dates, max_str_len)
 
     # 列表包含 DataFrame
     if isinstance(result, list):
-        return _format_list(result, max_rows)
+        return _format_list(result, max_rows, parse_dates, max_str_len)
 
     # 字典包含 DataFrame
     if isinstance(result, dict):
-        return _format_dict(result, max_rows)
+        return _format_dict(result, max_rows, parse_dates, max_str_len)
 
     # 原始类型直接返回
-    return result
+    return _truncate_str(result, max_str_len)
+
 
+def _truncate_str(value: Any, max_str_len: Optional[int]) -> Any:
+    """超长字符串截断，其他值原样返回"""
+    if max_str_len is not None and isinstance(value, str) and len(value) > max_str_len:
+        return value[:max_str_len] + "..."
+    return value
 
-def _format_dataframe(df: pd.DataFrame, max_rows: int) -> Dict:
+
+def _format_dataframe(df: "pd.DataFrame", max_rows: int, parse_dates: bool = False,
+                      max_str_len: Optional[int] = None) -> Dict:
     """格式化 DataFrame"""
     # 记录原始行数
     original_rows = len(df)
 
-    # 限制行数
+    # 限制行数 - 只读取数据，无需复制
     truncated = False
     if original_rows > max_rows:
-        df = df.head(max_rows).copy()  # 截断时一次性复制
+        df = df.head(max_rows)
         truncated = True
-    else:
-        df = df.copy()  # 非截断也需要复制避免修改原数据
 
-    # 转换日期类型 - 只有当列中大部分值看起来像日期时才转换
+    if parse_dates:
+        df = _parse_date_columns(df)
+
+    records = _dataframe_records(df)
+    if max_str_len is not None:
+        # 只处理截断后的行
+        records = [
+            {key: _truncate_str(value, max_str_len) for key, value in record.items()}
+            for record in records
+        ]
+    result = {"data": records}
+
+    if truncated:
+        result["warning"] = f"数据已截断，只显示前 {max_rows} 行"
+        result["total_rows"] = original_rows
+
+    return result
+
+
+def _format_series(series: "pd.Series", max_rows: int, parse_dates: bool = False,
+                   max_str_len: Optional[int] = None) -> Dict:
+    """格式化 Series"""
+    return series.to_dict()
+
+
+def _dataframe_records(df: "pd.DataFrame") -> List[Dict]:
+    """
+    DataFrame 转为记录列表。
+
+    日期时间列先转为 ISO 字符串 (保留小数秒和时区，date 只保留日期)，
+    其余由 pandas 的 C 实现 to_json 完成逐行逐列转换: NaN/NaT 转为 None，
+    不支持的对象按 str 处理。
+    """
+    if not df.columns.is_unique:
+        # to_json 要求列名唯一，重复列名时逐个转换
+        return _dataframe_records_slow(df)
+
+    payload = _stringify_datetimes(df).to_json(
+        orient="records",
+        date_format="iso",
+        double_precision=15,
+        default_handler=str,
+        force_ascii=False,
+    )
+    return orjson.loads(payload)
+
+
+def _stringify_datetimes(df: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    日期时间列转为 ISO 字符串。
+
+    to_json 会把带时区的时间换算为 UTC、给 date 补上 00:00:00，
+    因此这些列不交给 to_json 处理。
+    """
+    converted = {}
+    for name, col in df.items():
+        if pd.api.types.is_datetime64_any_dtype(col.dtype) or (
+                col.dtype == object and _has_datetimes(col)):
+            converted[name] = col.astype(object).map(_isoformat)
+
+    if not converted:
+        return df
+    df = df.copy(deep=False)
+    for name, col in converted.items():
+        df[name] = col
+    return df
+
+
+def _has_datetimes(col: "pd.Series") -> bool:
+    """object 列中是否含有 date/datetime 值 (可能与数字、字符串混合)"""
+    inferred = pd.api.types.infer_dtype(col, skipna=True)
+    if inferred in ("date", "datetime"):
+        return True
+    if not inferred.startswith("mixed"):
+        return False
+    return any(isinstance(value, (datetime, date)) for value in col)
+
+
+def _isoformat(value: Any) -> Any:
+    """日期时间转为 ISO 字符串，NaT 转为 None，其他值原样返回"""
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _dataframe_records_slow(df: "pd.DataFrame") -> List[Dict]:
+    """逐条转换记录 (列名重复时使用)"""
+    data = df.to_dict(orient="records")
+
+    # 转换日期为字符串
+    for record in data:
+        for key, value in record.items():
+            if isinstance(value, (pd.Timestamp, datetime, date)):
+                record[key] = _isoformat(value)
+            elif pd.isna(value):
+                record[key] = None
+    return data
+
+
+def _parse_date_columns(df: "pd.DataFrame") -> "pd.DataFrame":
+    """转换日期类型 - 只有当列中大部分值看起来像日期时才转换"""
+    df = df.copy()  # 避免修改调用方的数据
     for col in df.columns:
-        if df[col].dtype == "object":
+        # object 列或字符串列 (pandas 3 默认为 str 类型)
+        if pd.api.types.is_string_dtype(df[col].dtype):
             # 跳过包含空值的列
             if df[col].isna().any() or (df[col] == '').any():
                 continue
 
             # 检查是否大部分值像日期 (包含 - 或 /)
             sample = df[col].astype(str).iloc[:10]
+            # 样本中没有数字 (名称、分类等文本列)，不可能是日期
+            if not any(_HAS_DIGIT.search(v) for v in sample):
+                continue
             date_like = sum(1 for v in sample if '-' in v or '/' in v)
             if date_like >= len(sample) * 0.5:
                 try:
-                    df[col] = pd.to_datetime(df[col], errors="coerce")
+                    df[col] = _to_datetime_memo(df[col])
                 except Exception:
                     pass
+    return df
 
-    # 转换为字典
-    data = df.to_dict(orient="records")
 
-    # 转换日期为字符串
-    for record in data:
-        for key, value in record.items():
-            if isinstance(value, (pd.Timestamp, datetime, date)):
-                record[key] = str(value)
-            elif pd.isna(value):
-                record[key] = None
-
-    result = {"data": data}
-
-    if truncated:
-        result["warning"] = f"数据已截断，只显示前 {max_rows} 行"
-        result["total_rows"] = original_rows
-
-    return result
+def _to_datetime_memo(col: "pd.Series") -> "pd.Series":
+    """按唯一值解析日期再映射回列，交易日等重复日期只解析一次"""
+    unique = col.dropna().unique()
+    parsed = pd.to_datetime(pd.Index(unique), errors="coerce", format="ISO8601")
+    if parsed.isna().any():
+        # 非 ISO8601 格式 (如 2024/01/02)，退回按首个值推断格式
+        parsed = pd.to_datetime(pd.Index(unique), errors="coerce")
+    return col.map(dict(zip(unique, parsed)))
 
 
-def _format_list(items: List, max_rows: int) -> Any:
+def _format_list(items: List, max_rows: int, parse_dates: bool = False,
+                 max_str_len: Optional[int] = None) -> Any:
     """格式化列表"""
     if not items:
         return {"data": []}
 
     # 列表中包含 DataFrame
-    if len(items) > 0 and isinstance(items[0], pd.DataFrame):
+    if len(items) > 0 and _is_dataframe(items[0]):
         result = []
         for i, df in enumerate(items[:max_rows]):
-            formatted = _format_dataframe(df, max_rows)
+            formatted = _format_dataframe(df, max_rows, parse_dates, max_str_len)
             result.append(formatted)
 
         if len(items) > max_rows:
@@ -105,23 +259,35 @@ def _format_list(items: List, max_rows: int) -> Any:
             }
         return {"data": result}
 
-    # 普通列表
-    return {"data": items}
+    # 普通列表 - 同样只保留前 max_rows 项
+    result = {"data": [_truncate_str(item, max_str_len) for item in items[:max_rows]]}
+    if len(items) > max_rows:
+        result["warning"] = f"数据已截断，只显示前 {max_rows} 行"
+        result["total_rows"] = len(items)
+    return result
 
 
-def _format_dict(data: Dict, max_rows: int) -> Dict:
+def _format_dict(data: Dict, max_rows: int, parse_dates: bool = False,
+                 max_str_len: Optional[int] = None) -> Dict:
     """格式化字典"""
     result = {}
     for key, value in data.items():
-        if isinstance(value, pd.DataFrame):
-            result[key] = _format_dataframe(value, max_rows)
+        if _is_dataframe(value):
+            result[key] = _format_dataframe(value, max_rows, parse_dates, max_str_len)
         elif isinstance(value, (list, dict)):
-            result[key] = format_result(value, max_rows)
+            result[key] = format_result(value, max_rows, parse_dates, max_str_len)
         else:
-            result[key] = value
+            result[key] = _truncate_str(value, max_str_len)
     return result
 
 
+# 精确类型 -> 格式化函数，pandas 类型由 _import_pd 注册
+_DISPATCH = {
+    list: _format_list,
+    dict: _format_dict,
+}
+
+
 def format_search_results(results: List[Dict]) -> str:
     """格式化搜索结果为可读文本"""
     if not results:
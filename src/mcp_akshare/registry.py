@@ -3,21 +3,79 @@ AKShare 函数注册表 - 基于文档文件解析
 分类 = 文件名 (如 stock, futures, index 等)
 """
 
+import asyncio
 import os
 import re
+import sys
 import logging
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
-
-import akshare as ak
+import copy
+import functools
+import hashlib
+import importlib
+import json
+import math
+import pickle
+import threading
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import numpy as np
+from cachetools import TTLCache
+
+from .cache import FileCache, user_cache_dir
+
+try:
+    # 可选依赖: 多模式匹配查询词中包含的关键词
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 logger = logging.getLogger(__name__)
 
-# 预编译正则表达式
-_INTERFACE_PATTERN = re.compile(r'接口:\s*(\w+)\s*\n(.*?)(?=\n接口:\s*\w+\s*\n|\Z)', re.DOTALL)
-_DESC_PATTERN = re.compile(r'描述:\s*([^\n]+)')
-_INPUT_PARAMS_PATTERN = re.compile(r'输入参数\s*\n((?:\|[^\n]+\n)+)')
-_PARAM_ROW_PATTERN = re.compile(r'\|\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\|')
+# 文档解析状态
+_OUTSIDE = 0        # 第一个接口之前
+_IN_INTERFACE = 1   # 接口块内
+_IN_PARAMS = 2      # 输入参数表内
+
+# 解析结果缓存文件名 (位于文档目录下，目录不可写时放到用户缓存目录)
+_CACHE_FILENAME = '.registry.cache.pkl'
+# 解析逻辑变化时递增，使旧缓存失效
+_CACHE_VERSION = 7
+
+# 描述分词
+_WORD_RE = re.compile(r'\w+')
+
+def _normalize(text: str) -> str:
+    """搜索用规范化: 全角转半角 (NFKC) 并忽略大小写，关键词和查询词使用相同规则"""
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+# 关键词子串索引的最大 n-gram 长度
+_NGRAM_SIZE = 3
+
+# BM25 排序参数
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+# 搜索结果缓存条数
+_SEARCH_CACHE_SIZE = 1024
+
+# akshare 调用结果缓存: 条数和有效期 (秒)，AKSHARE_CACHE_TTL=0 关闭
+_CALL_CACHE_SIZE = 1024
+_CALL_CACHE_TTL = int(os.environ.get('AKSHARE_CACHE_TTL', '60'))
+
+# akshare 调用结果磁盘缓存有效期 (秒)，进程重启后仍可复用。
+# 默认关闭，设置 AKSHARE_FILE_CACHE_TTL>0 开启；AKSHARE_CACHE_TTL=0 时同样关闭
+_FILE_CACHE_TTL = int(os.environ.get('AKSHARE_FILE_CACHE_TTL', '0'))
+
+# 缓存未命中标记
+_MISSING = object()
+
+# 并发读取文档的线程数
+_READ_WORKERS = 8
 
 
 class RegistryError(Exception):
@@ -47,29 +105,34 @@ class AkshareError(RegistryError):
         super().__init__(f"AKShare 执行错误: {message}")
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FunctionInfo:
-    """函数元信息"""
+    """函数元信息 (不可变，使用 slots 减少每个实例的内存)"""
     name: str           # 函数名 (不含模块前缀)
     full_name: str      # 完整名称 (category_function)
     category: str       # 分类 = 文件名 (stock, futures, index 等)
     description: str   # 描述
     params: List[Dict] # 参数列表
     doc_path: str      # 文档路径
+    _search_result: Dict = field(init=False, repr=False, compare=False)
 
-    def to_search_result(self) -> Dict:
-        # 返回搜索结果
+    def __post_init__(self):
+        # 搜索结果只读，解析时生成一次，之后每次搜索直接复用
         # 去掉 ak_ 前缀
         display_name = self.full_name
         if display_name.startswith("ak_"):
             display_name = display_name[3:]
-        return {
+        object.__setattr__(self, "_search_result", {
             "name": display_name,
             "description": self.description,
             "category": self.category,
             "params": self.params,
             "full_name": self.full_name,
-        }
+        })
+
+    def to_search_result(self) -> Dict:
+        # 返回搜索结果 (共享引用，调用方不应修改)
+        return self._search_result
 
 
 class DocRegistry:
@@ -78,7 +141,36 @@ class DocRegistry:
     def __init__(self, docs_dir: str):
         self.docs_dir = docs_dir
         self.functions: Dict[str, FunctionInfo] = {}
-        self._index: Dict[str, List[str]] = {}
+        # 关键词 -> {函数全名: 词频}
+        self._index: Dict[str, Dict[str, int]] = defaultdict(dict)
+        # 函数全名 -> 关键词总数 (BM25 文档长度)
+        self._doc_len: Dict[str, int] = {}
+        # 向量化评分用: 文档编号 -> 函数全名，关键词 -> 在连续倒排数组中的 (起, 止) 位置
+        self._doc_names: List[str] = []
+        self._postings: Dict[str, tuple] = {}
+        self._post_ids = np.zeros(0, dtype=np.int32)
+        self._post_tfs = np.zeros(0, dtype=np.float32)
+        # 每个文档的 BM25 长度归一项 k1 * (1 - b + b * dl / avgdl)
+        self._bm25_norm = np.zeros(0, dtype=np.float32)
+        # n-gram -> 包含该 n-gram 的关键词 (元组)，用于子串匹配
+        self._ngrams: Dict[str, tuple] = {}
+        # 最长关键词的长度，限制子串枚举的范围
+        self._max_keyword_len = 0
+        # 按实例缓存搜索结果 (避免方法级 lru_cache 持有所有实例)
+        self._search_cached = functools.lru_cache(maxsize=_SEARCH_CACHE_SIZE)(self._search_impl)
+        # 调用结果缓存 (call 在线程池中执行，需要加锁)
+        self._call_cache = TTLCache(maxsize=_CALL_CACHE_SIZE, ttl=_CALL_CACHE_TTL) if _CALL_CACHE_TTL > 0 else None
+        self._call_lock = threading.Lock()
+        # akshare 模块，首次调用时导入
+        self._ak = None
+        # akshare 函数名 -> 函数对象，首次调用某个函数时登记
+        self._fn_table: Dict[str, Callable] = {}
+        # 调用结果磁盘缓存 (可选)
+        self._file_cache = None
+        if _FILE_CACHE_TTL > 0 and _CALL_CACHE_TTL > 0:
+            self._file_cache = FileCache(os.path.join(user_cache_dir(), 'api'), _FILE_CACHE_TTL)
+        # 全部关键词的 Aho-Corasick 自动机 (安装 pyahocorasick 时启用)
+        self._automaton = None
         self._initialized = False
 
     def initialize(self):
@@ -87,11 +179,89 @@ class DocRegistry:
             return
 
         logger.info(f"解析 akshare 文档 from {self.docs_dir}...")
-        self._parse_all_docs()
-        self._build_index()
-        logger.info(f"已索引 {len(self.functions)} 个函数")
+        cache_path = self._cache_path()
+        signature = self._docs_signature()
+        if signature and self._load_cache(cache_path, signature):
+            logger.info(f"已从缓存加载 {len(self.functions)} 个函数")
+        else:
+            self._parse_all_docs()
+            self._build_index()
+            if signature:
+                self._save_cache(cache_path, signature)
+            logger.info(f"已索引 {len(self.functions)} 个函数")
+        self._build_postings()
+        self._build_automaton()
+        self._search_cached.cache_clear()
         self._initialized = True
 
+    def _cache_path(self) -> str:
+        """解析缓存路径: 优先文档目录，只读时使用 ~/.cache/mcp_akshare (可用 AKSHARE_CACHE_DIR 覆盖)"""
+        if os.access(self.docs_dir, os.W_OK):
+            return os.path.join(self.docs_dir, _CACHE_FILENAME)
+
+        # 不同文档目录使用不同的缓存文件
+        digest = hashlib.sha1(os.path.abspath(self.docs_dir).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(user_cache_dir(), f'registry-{digest}.pkl')
+
+    def _docs_signature(self) -> Dict[str, tuple]:
+        """文档签名: {文件名: (mtime_ns, size)}，任一文档变化即失效"""
+        try:
+            entries = self._scan_doc_files()
+        except OSError:
+            return {}
+
+        signature = {}
+        for entry in entries:
+            st = entry.stat()
+            signature[entry.name] = (st.st_mtime_ns, st.st_size)
+        return signature
+
+    def _scan_doc_files(self) -> List[os.DirEntry]:
+        """列出文档目录下的 .md 文件"""
+        with os.scandir(self.docs_dir) as it:
+            return [e for e in it if e.name.endswith('.md') and e.is_file()]
+
+    def _load_cache(self, path: str, signature: Dict[str, tuple]) -> bool:
+        """签名一致时从缓存恢复 functions 和 _index，返回是否命中"""
+        try:
+            with open(path, 'rb') as f:
+                version, cached_signature, rows, index, ngrams, doc_len = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"读取文档缓存失败: {e}")
+            return False
+
+        if version != _CACHE_VERSION or cached_signature != signature:
+            return False
+
+        # 缓存中存放纯数据元组，避免依赖模块导入路径
+        self.functions = {row[1]: FunctionInfo(*row) for row in rows}
+        self._index = index
+        self._ngrams = ngrams
+        self._doc_len = doc_len
+        return True
+
+    def _save_cache(self, path: str, signature: Dict[str, tuple]):
+        """写入解析缓存，失败不影响正常使用"""
+        rows = [
+            (info.name, info.full_name, info.category, info.description, info.params, info.doc_path)
+            for info in self.functions.values()
+        ]
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((_CACHE_VERSION, signature, rows, self._index, self._ngrams, self._doc_len),
+                            f, protocol=5)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"写入文档缓存失败: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
     def _parse_all_docs(self):
         """解析所有文档目录下的 .md 文件"""
         if not os.path.isdir(self.docs_dir):
@@ -99,75 +269,97 @@ class DocRegistry:
             return
 
         try:
-            filenames = os.listdir(self.docs_dir)
+            entries = self._scan_doc_files()
         except OSError as e:
             logger.error(f"读取文档目录失败: {e}")
             return
 
-        for filename in filenames:
-            if not filename.endswith('.md'):
-                continue
+        # 并发读取文件，解析仍按目录顺序串行进行
+        with ThreadPoolExecutor(max_workers=_READ_WORKERS) as pool:
+            contents = list(pool.map(_read_doc, (e.path for e in entries)))
 
-            category = filename[:-3]  # 去掉 .md 后缀
-            filepath = os.path.join(self.docs_dir, filename)
-            self._parse_doc_file(filepath, category)
-
-    def _parse_doc_file(self, filepath: str, category: str):
-        """解析单个文档文件"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # 解析每个接口块
-        # 格式: 接口: 函数名 ... (直到下一个接口: 或文件结束)
-        matches = _INTERFACE_PATTERN.findall(content)
-
-        for func_name, block in matches:
-            # 解析描述
-            description = ""
-            desc_match = _DESC_PATTERN.search(block)
-            if desc_match:
-                description = desc_match.group(1).strip()
-
-            # 解析输入参数
-            params = []
-            # 更精确的匹配：从"输入参数"标题到表格结束（下一个空行或输出参数）
-            input_match = _INPUT_PARAMS_PATTERN.search(block)
-            if input_match:
-                table_lines = input_match.group(1).strip().split('\n')
-                for line in table_lines:
-                    # 跳过表头
-                    if '---' in line or '名称' in line or '类型' in line:
-                        continue
-                    # 匹配参数行: | name | type | ...
-                    # 参数名只能是字母数字下划线
-                    match = _PARAM_ROW_PATTERN.match(line)
-                    if match:
-                        param_name = match.group(1)
-                        # 提取类型（第二列）
-                        type_match = re.search(r'\|[^\|]+\|([^\|]+)\|', line)
-                        param_type = type_match.group(1).strip() if type_match else 'string'
-                        params.append({
-                            "name": param_name,
-                            "type": param_type,
-                        })
+        for entry, content in zip(entries, contents):
+            category = entry.name[:-3]  # 去掉 .md 后缀
+            self._parse_doc_file(entry.path, category, content)
 
-            # 生成完整名称，避免重复
-            # 例如: category="futures", func_name="futures_inventory_em" -> "ak_futures_inventory_em"
-            if func_name.startswith(f"{category}_"):
-                full_name = f"ak_{func_name}"
-            else:
-                full_name = f"ak_{category}_{func_name}"
+    def _parse_doc_file(self, filepath: str, category: str, content: str):
+        """
+        解析单个文档文件 - 逐行扫描的状态机，只顺序扫描一遍。
 
-            info = FunctionInfo(
-                name=func_name,
-                full_name=full_name,
-                category=category,
-                description=description,
-                params=params,
-                doc_path=filepath,
-            )
+        格式: 接口: 函数名 ... (直到下一个接口: 或文件结束)，
+        块内取第一行"描述:"和第一个"输入参数"表格。
+        """
+        state = _OUTSIDE
+        func_name = None
+        description = None
+        params = []
+        params_done = False
+
+        for line in content.split('\n'):
+            stripped = line.strip()
+
+            if stripped.startswith('接口:'):
+                name = stripped[3:].strip()
+                if name and name.replace('_', '').isalnum():
+                    if func_name is not None:
+                        self._add_function(func_name, category, description, params, filepath)
+                    state = _IN_INTERFACE
+                    func_name = name
+                    description = None
+                    params = []
+                    params_done = False
+                    continue
+
+            if state == _OUTSIDE:
+                continue
 
-            self.functions[full_name] = info
+            if state == _IN_PARAMS:
+                if stripped.startswith('|'):
+                    # 参数行: | name | type | ...，表头/分隔行的首列不是标识符
+                    params_done = True
+                    parts = stripped.split('|')
+                    param_name = parts[1].strip()
+                    if param_name.isascii() and param_name.isidentifier():
+                        param_type = parts[2].strip() if len(parts) > 3 else ''
+                        # symbol/date、str 等参数名和类型大量重复，驻留后共享
+                        params.append({
+                            "name": sys.intern(param_name),
+                            "type": sys.intern(param_type or 'string'),
+                        })
+                    continue
+                if not stripped and not params_done:
+                    # 标题与表格之间的空行
+                    continue
+                state = _IN_INTERFACE
+
+            if description is None and stripped.startswith('描述:'):
+                description = stripped[3:].strip()
+            elif not params_done and stripped == '输入参数':
+                state = _IN_PARAMS
+
+        if func_name is not None:
+            self._add_function(func_name, category, description, params, filepath)
+
+    def _add_function(self, func_name: str, category: str, description: Optional[str],
+                      params: List[Dict], filepath: str):
+        """登记一个解析出的接口"""
+        # 同一文件的所有接口共享分类字符串
+        category = sys.intern(category)
+        # 生成完整名称，避免重复
+        # 例如: category="futures", func_name="futures_inventory_em" -> "ak_futures_inventory_em"
+        if func_name.startswith(f"{category}_"):
+            full_name = f"ak_{func_name}"
+        else:
+            full_name = f"ak_{category}_{func_name}"
+
+        self.functions[full_name] = FunctionInfo(
+            name=func_name,
+            full_name=full_name,
+            category=category,
+            description=description or "",
+            params=params,
+            doc_path=filepath,
+        )
 
     def _build_index(self):
         """构建搜索索引"""
@@ -177,56 +369,170 @@ class DocRegistry:
 
             # 从描述提取关键词
             if info.description:
-                words = re.findall(r"[\w]+", info.description)
+                words = _WORD_RE.findall(info.description)
                 keywords.extend(words)
 
             # 从参数名提取关键词
             for p in info.params:
                 keywords.append(p.get("name", ""))
 
+            doc_len = 0
             for kw in keywords:
-                kw = kw.lower()
-                if kw not in self._index:
-                    self._index[kw] = []
-                if full_name not in self._index[kw]:
-                    self._index[kw].append(full_name)
+                if kw:
+                    # 驻留关键词，索引和 n-gram 表共享同一字符串对象
+                    postings = self._index[sys.intern(_normalize(kw))]
+                    postings[full_name] = postings.get(full_name, 0) + 1
+                    doc_len += 1
+            self._doc_len[full_name] = doc_len
+
+        # 关键词 n-gram 索引: 按序遍历关键词，每个 n-gram 的关键词列表天然有序，无需逐个排序
+        ngrams = defaultdict(list)
+        for kw in sorted(self._index):
+            size = len(kw)
+            for gram in {kw[i:i + n] for n in range(1, _NGRAM_SIZE + 1) for i in range(size - n + 1)}:
+                ngrams[gram].append(kw)
+        # 建好后转为元组: 大多数 n-gram 只对应一两个关键词，元组比集合小得多
+        self._ngrams = {gram: tuple(kws) for gram, kws in ngrams.items()}
+
+    def _build_postings(self):
+        """把关键词倒排转换为 numpy 数组，搜索时向量化计算得分"""
+        # 按函数名排序编号，得分相同时按编号排序即按函数名排序
+        self._doc_names = sorted(self.functions)
+        doc_ids = {name: i for i, name in enumerate(self._doc_names)}
+
+        # 所有关键词的倒排拼接为两个连续数组 (int32 编号 + float32 词频)，
+        # 每个关键词只记录区间，避免数千个小数组各自的对象开销
+        ids, tfs = [], []
+        self._postings = {}
+        for kw, funcs in self._index.items():
+            start = len(ids)
+            ids.extend(doc_ids[func] for func in funcs)
+            tfs.extend(funcs.values())
+            self._postings[kw] = (start, len(ids))
+        self._max_keyword_len = max(map(len, self._index), default=0)
+        self._post_ids = np.array(ids, dtype=np.int32)
+        self._post_tfs = np.array(tfs, dtype=np.float32)
+
+        doc_len = np.array([self._doc_len.get(name, 0) for name in self._doc_names], dtype=np.float32)
+        avg_len = doc_len.mean() if len(doc_len) and doc_len.any() else np.float32(1)
+        self._bm25_norm = (_BM25_K1 * (1 - _BM25_B + _BM25_B * doc_len / avg_len)).astype(np.float32)
+
+    def _match_keywords(self, word: str) -> Set[str]:
+        """模糊匹配: 返回包含 word 或被 word 包含的所有关键词"""
+        # 关键词包含查询词: 短词直接查 n-gram，长词取三元组倒排交集后校验
+        if len(word) <= _NGRAM_SIZE:
+            matched = set(self._ngrams.get(word, ()))
+        else:
+            postings = [self._ngrams.get(word[i:i + _NGRAM_SIZE], ())
+                        for i in range(len(word) - _NGRAM_SIZE + 1)]
+            postings.sort(key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+            matched = {kw for kw in candidates if word in kw}
+
+        # 查询词包含关键词: 自动机一次扫描，未安装时枚举查询词的子串
+        if self._automaton is not None:
+            matched.update(kw for _, kw in self._automaton.iter(word))
+        else:
+            # 子串长度不超过最长关键词，长查询词也只需 O(len(word) * 最长关键词长度)
+            size = len(word)
+            for i in range(size):
+                for j in range(i + 1, min(size, i + self._max_keyword_len) + 1):
+                    if word[i:j] in self._index:
+                        matched.add(word[i:j])
+
+        return matched
+
+    def _build_automaton(self):
+        """用全部关键词构建 Aho-Corasick 自动机"""
+        if ahocorasick is None or not self._index:
+            self._automaton = None
+            return
+
+        automaton = ahocorasick.Automaton()
+        for kw in self._index:
+            automaton.add_word(kw, kw)
+        automaton.make_automaton()
+        self._automaton = automaton
 
     def search(self, keyword: str, limit: int = 20) -> List[Dict]:
         """搜索函数 - 支持分词搜索"""
-        keyword = keyword.lower().strip()
-        results = set()
-
         # 分词搜索：将关键词按空格分开，每个词都要匹配
-        words = keyword.split()
+        words = tuple(_normalize(keyword).split())
+        full_names = self._search_cached(words, limit)
+        return [self.functions[full_name].to_search_result() for full_name in full_names]
+
+    def search_batch(self, keywords: List[str], limit: int = 20) -> List[List[Dict]]:
+        """
+        批量搜索 - 多个查询共享分词匹配，相同的词只匹配一次。
 
-        # 收集所有匹配的函数
-        all_matches = {}
+        Args:
+            keywords: 查询列表，每个查询与 search 的 keyword 相同
+            limit: 每个查询返回结果数量，默认 20
+
+        Returns:
+            与 keywords 一一对应的结果列表
+        """
+        queries = [tuple(_normalize(keyword).split()) for keyword in keywords]
+
+        # 所有查询的词去重后统一匹配
+        word_funcs = {}
+        for words in queries:
+            for word in words:
+                if word not in word_funcs:
+                    word_funcs[word] = self._match_word(word)
+
+        return [
+            [self.functions[full_name].to_search_result()
+             for full_name in self._combine_matches(words, word_funcs, limit)]
+            for words in queries
+        ]
+
+    async def asearch(self, keyword: str, limit: int = 20) -> List[Dict]:
+        """search 的异步版本，在线程池中执行，多个搜索可用 asyncio.gather 并发"""
+        return await asyncio.to_thread(self.search, keyword, limit)
+
+    def _search_impl(self, words: tuple, limit: int) -> tuple:
+        """搜索实现，返回匹配的函数全名 (结果经 lru_cache 缓存)"""
+        word_funcs = {word: self._match_word(word) for word in words}
+        return self._combine_matches(words, word_funcs, limit)
+
+    def _match_word(self, word: str) -> np.ndarray:
+        """单个词在每个文档中命中的关键词次数 (精确匹配 + 模糊匹配)"""
+        tf = np.zeros(len(self._doc_names), dtype=np.float32)
+        for kw in self._match_keywords(word):
+            start, end = self._postings[kw]
+            # 同一关键词的文档编号不重复，可以直接按下标累加
+            tf[self._post_ids[start:end]] += self._post_tfs[start:end]
+        return tf
+
+    def _combine_matches(self, words: tuple, word_funcs: Dict[str, np.ndarray], limit: int) -> tuple:
+        """合并各词的匹配结果，只保留所有词都匹配的函数，按 BM25 得分取前 limit 个"""
+        total = len(self._doc_names)
+        if not words or not total or limit <= 0:
+            return ()
+
+        scores = np.zeros(total, dtype=np.float32)
+        mask = np.ones(total, dtype=bool)
         for word in words:
-            word_results = set()
-            # 精确匹配
-            if word in self._index:
-                word_results.update(self._index[word])
-            # 模糊匹配
-            for kw, funcs in self._index.items():
-                if word in kw or kw in word:
-                    word_results.update(funcs)
-
-            # 记录每个词的匹配结果
-            for func in word_results:
-                all_matches[func] = all_matches.get(func, 0) + 1
-
-        # 只返回所有词都匹配的函数
-        for func, match_count in all_matches.items():
-            if match_count == len(words):
-                results.add(func)
-
-        # 转换为结果
-        output = []
-        for full_name in list(results)[:limit]:
-            if full_name in self.functions:
-                output.append(self.functions[full_name].to_search_result())
-
-        return output
+            tf = word_funcs[word]
+            matched = tf > 0
+            mask &= matched
+            df = np.count_nonzero(matched)
+            idf = np.float32(math.log(1 + (total - df + 0.5) / (df + 0.5)))
+            # 全程 float32: 排序精度足够，数据量减半
+            scores += idf * tf * np.float32(_BM25_K1 + 1) / (tf + self._bm25_norm)
+
+        candidates = np.flatnonzero(mask)
+        cand_scores = scores[candidates]
+        if len(candidates) > limit:
+            # 只保留不低于第 limit 高得分的候选，避免整体排序
+            kth = np.partition(cand_scores, len(candidates) - limit)[len(candidates) - limit]
+            keep = cand_scores >= kth
+            candidates, cand_scores = candidates[keep], cand_scores[keep]
+
+        # 得分降序，相同时按函数名排序，保证结果稳定
+        order = np.lexsort((candidates, -cand_scores))[:limit]
+        return tuple(self._doc_names[i] for i in candidates[order])
 
     def get_function(self, full_name: str) -> Optional[FunctionInfo]:
         """获取函数信息"""
@@ -268,8 +574,12 @@ class DocRegistry:
 
         return sorted(categories.values(), key=lambda x: x["category"])
 
-    def call(self, func_name: str, params: Dict) -> Any:
-        """调用函数 - 支持带或不带 ak_ 前缀"""
+    def call(self, func_name: str, params: Dict, force_refresh: bool = False) -> Any:
+        """
+        调用函数 - 支持带或不带 ak_ 前缀
+
+        相同函数和参数在缓存有效期内直接返回上次结果的副本 (先查内存，再查磁盘)，force_refresh=True 时跳过缓存重新获取。
+        """
         # 尝试查找函数
         info = None
         # 1. 直接查找（不带前缀）
@@ -290,14 +600,24 @@ class DocRegistry:
         # 获取实际的 akshare 函数名
         actual_func_name = info.name
 
-        try:
-            # 直接从 akshare 主模块调用
-            func = getattr(ak, actual_func_name, None)
-            if func is None:
-                raise FunctionNotFoundError(actual_func_name)
+        cache_key = self._call_cache_key(actual_func_name, params)
+        if cache_key is not None and not force_refresh:
+            cached = _MISSING
+            if self._call_cache is not None:
+                with self._call_lock:
+                    cached = self._call_cache.get(cache_key, _MISSING)
+            if cached is _MISSING and self._file_cache is not None:
+                # 内存未命中时查磁盘缓存 (其他进程或上次运行的结果)
+                cached = self._file_cache.get(':'.join(cache_key), _MISSING)
+                if cached is not _MISSING and self._call_cache is not None:
+                    with self._call_lock:
+                        self._call_cache[cache_key] = cached
+            if cached is not _MISSING:
+                # 返回副本，调用方原地修改 (如 df[...] = ...) 不影响缓存
+                return copy.deepcopy(cached)
 
-            result = func(**params)
-            return result
+        try:
+            result = self._resolve(actual_func_name)(**params)
 
         except TypeError as e:
             # 参数错误
@@ -306,6 +626,46 @@ class DocRegistry:
             # 其他错误
             raise AkshareError(str(e), actual_func_name)
 
+        if cache_key is not None:
+            if self._call_cache is not None:
+                cached = copy.deepcopy(result)
+                with self._call_lock:
+                    self._call_cache[cache_key] = cached
+            if self._file_cache is not None:
+                self._file_cache.set(':'.join(cache_key), result)
+        return result
+
+    def _resolve(self, func_name: str) -> Callable:
+        """akshare 函数名 -> 函数对象，查找结果记入函数表"""
+        func = self._fn_table.get(func_name)
+        if func is not None:
+            return func
+
+        # akshare 导入很重，首次调用时才导入，不拖慢服务启动和搜索
+        ak = self._ak
+        if ak is None:
+            ak = self._ak = sys.modules.get('akshare') or importlib.import_module('akshare')
+        # 直接从 akshare 主模块调用
+        func = getattr(ak, func_name, None)
+        if func is None:
+            raise FunctionNotFoundError(func_name)
+
+        self._fn_table[func_name] = func
+        return func
+
+    async def acall(self, func_name: str, params: Dict, force_refresh: bool = False) -> Any:
+        """call 的异步版本，在线程池中执行，不阻塞事件循环"""
+        return await asyncio.to_thread(self.call, func_name, params, force_refresh)
+
+    def _call_cache_key(self, func_name: str, params: Dict) -> Optional[tuple]:
+        """调用缓存键 (函数名, 规范化参数)，不可缓存时返回 None"""
+        if self._call_cache is None and self._file_cache is None:
+            return None
+        try:
+            return (func_name, json.dumps(params, sort_keys=True, ensure_ascii=False, separators=(',', ':')))
+        except TypeError:
+            return None
+
     def _validate_params(self, info: FunctionInfo, params: Dict) -> List[str]:
         """验证参数，返回错误列表"""
         errors = []
@@ -319,22 +679,34 @@ class DocRegistry:
         return errors
 
 
+def _read_doc(path: str) -> str:
+    """读取文档内容"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
 def _get_default_docs_dir():
     """获取默认文档目录路径"""
-    # 从环境变量获取
+    # 从环境变量获取，原样使用: 路径不存在时由初始化给出"文档目录不存在"警告，
+    # 不悄悄退回项目自带的文档
     env_path = os.environ.get('AKSHARE_DOCS_DIR')
-    if env_path and os.path.exists(env_path):
+    if env_path:
         return env_path
 
-    # 相对于项目根目录
+    # 相对于项目根目录，不存在时同样由初始化给出明确错误
     project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    relative_path = os.path.join(project_root, 'akshare_docs')
-
-    if os.path.exists(relative_path):
-        return relative_path
-
-    return relative_path  # 返回路径让初始化时给出明确错误
+    return os.path.join(project_root, 'akshare_docs')
 
 
 # 默认注册表实例
 registry = DocRegistry(_get_default_docs_dir())
+_default_lock = threading.Lock()
+
+
+def get_default() -> DocRegistry:
+    """返回已初始化的默认注册表，进程内只初始化一次 (之后的进程从磁盘缓存加载)"""
+    if not registry._initialized:
+        with _default_lock:
+            if not registry._initialized:
+                registry.initialize()
+    return registry
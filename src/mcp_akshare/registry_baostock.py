@@ -17,6 +17,8 @@ _INTERFACE_PATTERN = re.compile(r'接口:\s*(\w+)\s*\n(.*?)(?=\n接口:\s*\w+\s*
 _DESC_PATTERN = re.compile(r'描述:\s*([^\n]+)')
 _INPUT_PARAMS_PATTERN = re.compile(r'输入参数\s*\n((?:\|[^\n]+\n)+)')
 _PARAM_ROW_PATTERN = re.compile(r'\|\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\|')
+_PARAM_TYPE_PATTERN = re.compile(r'\|[^\|]+\|([^\|]+)\|')
+_WORD_PATTERN = re.compile(r'[\w]+')
 
 
 class RegistryError(Exception):
@@ -145,7 +147,7 @@ class BaostockRegistry:
                     match = _PARAM_ROW_PATTERN.match(line)
                     if match:
                         param_name = match.group(1)
-                        type_match = re.search(r'\|[^\|]+\|([^\|]+)\|', line)
+                        type_match = _PARAM_TYPE_PATTERN.search(line)
                         param_type = type_match.group(1).strip() if type_match else 'string'
                         params.append({
                             "name": param_name,
@@ -169,7 +171,7 @@ class BaostockRegistry:
             keywords = [info.category, info.name]
 
             if info.description:
-                words = re.findall(r"[\w]+", info.description)
+                words = _WORD_PATTERN.findall(info.description)
                 keywords.extend(words)
 
             for p in info.params:
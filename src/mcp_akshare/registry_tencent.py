@@ -21,6 +21,9 @@ _INTERFACE_PATTERN = re.compile(r'接口:\s*(\w+)\s*\n(.*?)(?=\n接口:\s*\w+\s*
 _DESC_PATTERN = re.compile(r'描述:\s*([^\n]+)')
 _INPUT_PARAMS_PATTERN = re.compile(r'输入参数\s*\n((?:\|[^\n]+\n)+)')
 _PARAM_ROW_PATTERN = re.compile(r'\|\s*(\w+)\s*\|')
+_PARAM_TYPE_PATTERN = re.compile(r'\|[^\|]+\|([^\|]+)\|')
+_WORD_PATTERN = re.compile(r'[\w]+')
+_QUOTE_PATTERN = re.compile(r'v_([^=]+)="([^"]*)"')
 
 
 class RegistryError(Exception):
@@ -142,7 +145,7 @@ class TencentRegistry:
                     match = _PARAM_ROW_PATTERN.match(line)
                     if match:
                         param_name = match.group(1)
-                        type_match = re.search(r'\|[^\|]+\|([^\|]+)\|', line)
+                        type_match = _PARAM_TYPE_PATTERN.search(line)
                         param_type = type_match.group(1).strip() if type_match else 'string'
                         params.append({
                             "name": param_name,
@@ -166,7 +169,7 @@ class TencentRegistry:
             keywords = [info.category, info.name]
 
             if info.description:
-                words = re.findall(r"[\w]+", info.description)
+                words = _WORD_PATTERN.findall(info.description)
                 keywords.extend(words)
 
             for p in info.params:
@@ -335,7 +338,7 @@ class TencentRegistry:
                 continue
 
             # 解析 v_code="..."
-            match = re.match(r'v_([^=]+)="([^"]*)"', line)
+            match = _QUOTE_PATTERN.match(line)
             if not match:
                 continue
 
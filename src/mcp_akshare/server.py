@@ -4,16 +4,22 @@ MCP AKShare Server - 提供 akshare 函数搜索和调用能力
 
 import argparse
 import asyncio
+import atexit
 import json
 import os
 import logging
+import queue
+import time
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
 
+import orjson
 import pandas as pd
+from cachetools import TTLCache
 from fastmcp import FastMCP
 
-from .registry import DocRegistry, FunctionNotFoundError, ParameterError, AkshareError
+from .registry import FunctionNotFoundError, ParameterError, AkshareError, get_default
 from .registry_baostock import BaostockRegistry, FunctionNotFoundError as BSFunctionNotFoundError, ParameterError as BSPParameterError, BaostockError
 from .registry_tencent import TencentRegistry, FunctionNotFoundError as TXFunctionNotFoundError, ParameterError as TXParameterError, TencentError
 from .formatters import format_result, format_search_results
@@ -37,25 +43,53 @@ rotating_handler = RotatingFileHandler(
 )
 
 # 配置日志 - 避免重复添加 handler
+# 调用线程只把格式化好的记录放入队列，由后台线程写文件，避免磁盘 IO 阻塞事件循环
 root_logger = logging.getLogger()
 if not root_logger.handlers:
+    log_queue = queue.SimpleQueue()
+    log_listener = QueueListener(log_queue, rotating_handler, logging.StreamHandler())
+    log_listener.start()
+    atexit.register(log_listener.stop)
     logging.basicConfig(
         level=logging.INFO,
         format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            rotating_handler,
-            logging.StreamHandler()
-        ]
+        handlers=[QueueHandler(log_queue)]
     )
 logger = logging.getLogger(__name__)
 
+
+class _JsonLog:
+    """延迟序列化的日志参数，记录被级别过滤时不做 JSON 编码"""
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        try:
+            return orjson.dumps(self.data, default=str).decode()
+        except orjson.JSONEncodeError:
+            # orjson 不支持超过 64 位的整数，退回标准库
+            return json.dumps(self.data, ensure_ascii=False, separators=(',', ':'), default=str)
+
+
+# 工具响应序列化选项: 缩进便于阅读，兼容非字符串键和 numpy 标量
+_RESPONSE_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _dumps_response(data) -> str:
+    """序列化工具返回的 JSON 数据 (C 实现，大结果集明显快于 json)"""
+    try:
+        return orjson.dumps(data, default=str, option=_RESPONSE_OPTIONS).decode()
+    except orjson.JSONEncodeError:
+        # orjson 不支持超过 64 位的整数，退回标准库
+        return json.dumps(data, ensure_ascii=False, indent=2, default=str)
+
 # 创建 MCP 服务
 mcp = FastMCP("akshare")
 
-# 初始化注册表 - 使用文档目录
-docs_dir = os.environ.get('AKSHARE_DOCS_DIR', os.path.join(PROJECT_ROOT, 'akshare_docs'))
-registry = DocRegistry(docs_dir)
-registry.initialize()
+# 初始化注册表 - 使用文档目录 (AKSHARE_DOCS_DIR)，与直接使用 registry 模块的代码共享同一实例
+registry = get_default()
 
 # 初始化 baostock 注册表
 baostock_docs_dir = os.environ.get('BAOSTOCK_DOCS_DIR', os.path.join(PROJECT_ROOT, 'baostock_docs'))
@@ -67,6 +101,20 @@ tencent_docs_dir = os.environ.get('TENCENT_DOCS_DIR', os.path.join(PROJECT_ROOT,
 tencent_registry = TencentRegistry(tencent_docs_dir)
 tencent_registry.initialize()
 
+# ak_call 响应缓存: 相同函数和参数在 TTL 秒内直接返回上次的 JSON 字符串，设为 0 关闭
+RESPONSE_CACHE_TTL = int(os.environ.get('AKSHARE_CACHE_TTL', '60'))
+_response_cache = TTLCache(maxsize=256, ttl=RESPONSE_CACHE_TTL) if RESPONSE_CACHE_TTL > 0 else None
+
+
+def _response_cache_key(function: str, params_dict, max_str_len: Optional[int] = None) -> tuple:
+    """响应缓存键 (函数名, 规范化参数, 字符串截断长度)，不可缓存时返回 None"""
+    if _response_cache is None:
+        return None
+    try:
+        return (function, json.dumps(params_dict, sort_keys=True, ensure_ascii=False, separators=(',', ':')), max_str_len)
+    except TypeError:
+        return None
+
 
 @mcp.tool()
 async def ak_search(keyword: str, limit: int = 20) -> str:
@@ -84,22 +132,23 @@ async def ak_search(keyword: str, limit: int = 20) -> str:
         匹配的函数列表，包含名称、描述、分类、参数等信息
     """
     start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
     try:
         results = registry.search(keyword, limit)
     except Exception as e:
         logger.error(f"搜索失败: {e}", exc_info=True)
         return f"搜索失败: {str(e)}"
-    duration = (datetime.now() - start_time).total_seconds()
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
 
     # 记录搜索日志
-    logger.info(json.dumps({
+    logger.info("%s", _JsonLog({
         "timestamp": start_time.isoformat(),
         "type": "search",
         "keyword": keyword,
         "limit": limit,
         "duration_seconds": duration,
         "result_count": len(results),
-    }, ensure_ascii=False))
+    }))
 
     if not results:
         return f"未找到包含 '{keyword}' 的函数，请尝试其他关键词"
@@ -108,7 +157,8 @@ async def ak_search(keyword: str, limit: int = 20) -> str:
 
 
 @mcp.tool()
-async def ak_call(function: str, params: str = "{}") -> str:
+async def ak_call(function: str, params: str = "{}", force_refresh: bool = False,
+                  max_str_len: Optional[int] = None) -> str:
     """
     调用 akshare 函数。
 
@@ -118,6 +168,8 @@ async def ak_call(function: str, params: str = "{}") -> str:
     Args:
         function: 函数全名，如 "stock_lhb_detail_daily_sina"
         params: JSON 格式参数字典，如 '{"date": "20260227"}'
+        force_refresh: 是否跳过缓存重新获取数据 (实时行情等需要最新数据时使用)
+        max_str_len: 字符串字段最大长度，超出部分截断 (如公告、新闻正文)，默认不截断
 
     Returns:
         函数执行结果
@@ -133,10 +185,28 @@ async def ak_call(function: str, params: str = "{}") -> str:
         log_call(function, params, False, f"参数解析错误: {e}")
         return f"参数解析错误: {e}"
 
+    # 命中响应缓存时跳过 akshare 请求和序列化
+    cache_key = _response_cache_key(function, params_dict, max_str_len)
+    if cache_key is not None and not force_refresh:
+        cached = _response_cache.get(cache_key)
+        if cached is not None:
+            logger.info("CALL: %s", _JsonLog({
+                "timestamp": datetime.now().isoformat(),
+                "function": function,
+                "params": params_dict,
+                "duration_seconds": 0.0,
+                "success": True,
+                "error_type": None,
+                "result_rows": None,
+                "cached": True,
+            }))
+            return cached
+
     # 调用函数 - 使用线程池避免阻塞事件循环
     start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
     try:
-        result = await asyncio.to_thread(registry.call, function, params_dict)
+        result = await registry.acall(function, params_dict, force_refresh)
         success = True
         error_msg = None
     except FunctionNotFoundError as e:
@@ -157,7 +227,7 @@ async def ak_call(function: str, params: str = "{}") -> str:
         error_msg = str(e)
 
     # 记录日志
-    duration = (datetime.now() - start_time).total_seconds()
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
 
     # 确定错误类型
     error_type = None
@@ -195,13 +265,16 @@ async def ak_call(function: str, params: str = "{}") -> str:
         log_entry["error"] = result.get("error")
         log_entry["error_type"] = "AkshareReturnedError"
 
-    logger.info(f"CALL: {json.dumps(log_entry, ensure_ascii=False)}")
+    logger.info("CALL: %s", _JsonLog(log_entry))
 
     # 格式化输出
-    formatted = format_result(result)
+    formatted = format_result(result, max_str_len=max_str_len)
 
-    # 转为 JSON 字符串返回
-    return json.dumps(formatted, ensure_ascii=False, indent=2)
+    # 转为 JSON 字符串返回，仅缓存成功的结果
+    response = _dumps_response(formatted)
+    if cache_key is not None and log_entry["success"]:
+        _response_cache[cache_key] = response
+    return response
 
 
 @mcp.tool()
@@ -222,25 +295,40 @@ async def ak_logs(limit: int = 50) -> str:
     if not os.path.exists(log_file):
         return "暂无调用记录"
 
-    # 使用 deque 高效获取最后 limit 行，避免加载整个文件
-    from collections import deque
-    with open(log_file, 'r') as f:
-        last_lines = deque(f, maxlen=limit)
+    # 从文件末尾倒序读取最后 limit 行，读取量与日志文件大小无关
+    last_lines = _tail_lines(log_file, limit)
 
     # 解析并返回最近的日志
     entries = []
     for line in last_lines:
-        if 'CALL:' in line:
-            try:
-                entry = json.loads(line.split('CALL:')[1].strip())
-                entries.append(entry)
-            except Exception as e:
-                logger.warning(f"解析日志行失败: {e}")
+        _, sep, payload = line.partition('CALL: ')
+        if not sep:
+            continue
+        try:
+            entries.append(orjson.loads(payload))
+        except orjson.JSONDecodeError as e:
+            logger.warning(f"解析日志行失败: {e}")
 
     # 反转顺序，最新的在前
     entries.reverse()
 
-    return json.dumps(entries, ensure_ascii=False, indent=2)
+    return _dumps_response(entries)
+
+
+def _tail_lines(path: str, limit: int, block_size: int = 4096) -> list:
+    """按块从文件末尾向前读取，返回最后 limit 行"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b''
+        # 多读一个换行，保证块起始处被截断的行不计入结果
+        while pos > 0 and buf.count(b'\n') <= limit:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+
+    return buf.decode('utf-8', errors='replace').splitlines()[-limit:]
 
 
 @mcp.tool()
@@ -268,7 +356,7 @@ async def ak_list(category: str = None, limit: int = 100) -> str:
         "functions": results,
     }
 
-    return json.dumps(output, ensure_ascii=False, indent=2)
+    return _dumps_response(output)
 
 
 @mcp.tool()
@@ -290,7 +378,7 @@ async def ak_categories() -> str:
         "categories": categories,
     }
 
-    return json.dumps(output, ensure_ascii=False, indent=2)
+    return _dumps_response(output)
 
 
 # ==================== Baostock 工具函数 ====================
@@ -323,7 +411,7 @@ async def ba_search(keyword: str, limit: int = 20) -> str:
 
 
 @mcp.tool()
-async def ba_call(function: str, params: str = "{}") -> str:
+async def ba_call(function: str, params: str = "{}", max_str_len: Optional[int] = None) -> str:
     """
     调用 baostock 函数。
 
@@ -333,6 +421,7 @@ async def ba_call(function: str, params: str = "{}") -> str:
     Args:
         function: 函数全名，如 "query_stock_basic"
         params: JSON 格式参数字典，如 '{"code": "sh.600000"}'
+        max_str_len: 字符串字段最大长度，超出部分截断 (如公告、新闻正文)，默认不截断
 
     Returns:
         函数执行结果
@@ -349,6 +438,7 @@ async def ba_call(function: str, params: str = "{}") -> str:
 
     # 调用函数
     start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
     try:
         result = await asyncio.to_thread(baostock_registry.call, function, params_dict)
         success = True
@@ -371,7 +461,7 @@ async def ba_call(function: str, params: str = "{}") -> str:
         error_msg = str(e)
 
     # 记录日志
-    duration = (datetime.now() - start_time).total_seconds()
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
     error_type = None
     if not success:
         if isinstance(result, dict):
@@ -397,11 +487,11 @@ async def ba_call(function: str, params: str = "{}") -> str:
     if not success:
         log_entry["error"] = error_msg
 
-    logger.info(f"CALL: {json.dumps(log_entry, ensure_ascii=False)}")
+    logger.info("CALL: %s", _JsonLog(log_entry))
 
     # 格式化输出
-    formatted = format_result(result)
-    return json.dumps(formatted, ensure_ascii=False, indent=2)
+    formatted = format_result(result, max_str_len=max_str_len)
+    return _dumps_response(formatted)
 
 
 @mcp.tool()
@@ -428,7 +518,7 @@ async def ba_list(category: str = None, limit: int = 100) -> str:
         "functions": results,
     }
 
-    return json.dumps(output, ensure_ascii=False, indent=2)
+    return _dumps_response(output)
 
 
 @mcp.tool()
@@ -449,7 +539,7 @@ async def ba_categories() -> str:
         "categories": categories,
     }
 
-    return json.dumps(output, ensure_ascii=False, indent=2)
+    return _dumps_response(output)
 
 
 # ==================== Tencent 工具函数 ====================
@@ -482,7 +572,7 @@ async def tx_search(keyword: str, limit: int = 20) -> str:
 
 
 @mcp.tool()
-async def tx_call(function: str, params: str = "{}") -> str:
+async def tx_call(function: str, params: str = "{}", max_str_len: Optional[int] = None) -> str:
     """
     调用 tencent 函数。
 
@@ -492,6 +582,7 @@ async def tx_call(function: str, params: str = "{}") -> str:
     Args:
         function: 函数全名，如 "tx_quote"
         params: JSON 格式参数字典，如 '{"codes": "sh600000,sz000001"}'
+        max_str_len: 字符串字段最大长度，超出部分截断 (如公告、新闻正文)，默认不截断
 
     Returns:
         函数执行结果
@@ -508,6 +599,7 @@ async def tx_call(function: str, params: str = "{}") -> str:
 
     # 调用函数
     start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
     try:
         result = await asyncio.to_thread(tencent_registry.call, function, params_dict)
         success = True
@@ -530,7 +622,7 @@ async def tx_call(function: str, params: str = "{}") -> str:
         error_msg = str(e)
 
     # 记录日志
-    duration = (datetime.now() - start_time).total_seconds()
+    duration = (time.perf_counter_ns() - start_ns) / 1e9
     error_type = None
     if not success:
         if isinstance(result, dict):
@@ -556,11 +648,11 @@ async def tx_call(function: str, params: str = "{}") -> str:
     if not success:
         log_entry["error"] = error_msg
 
-    logger.info(f"CALL: {json.dumps(log_entry, ensure_ascii=False)}")
+    logger.info("CALL: %s", _JsonLog(log_entry))
 
     # 格式化输出
-    formatted = format_result(result)
-    return json.dumps(formatted, ensure_ascii=False, indent=2)
+    formatted = format_result(result, max_str_len=max_str_len)
+    return _dumps_response(formatted)
 
 
 @mcp.tool()
@@ -587,7 +679,7 @@ async def tx_list(category: str = None, limit: int = 100) -> str:
         "functions": results,
     }
 
-    return json.dumps(output, ensure_ascii=False, indent=2)
+    return _dumps_response(output)
 
 
 @mcp.tool()
@@ -608,7 +700,7 @@ async def tx_categories() -> str:
         "categories": categories,
     }
 
-    return json.dumps(output, ensure_ascii=False, indent=2)
+    return _dumps_response(output)
 
 
 def main():
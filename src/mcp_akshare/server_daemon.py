@@ -0,0 +1,222 @@
+"""
+MCP AKShare 常驻服务 - 通过 Unix socket 提供 MCP
+
+注册表、akshare 导入和调用缓存只在常驻进程中初始化一次，
+每个 stdio 会话由 run.py 转发到这里，省去每次启动的初始化开销。
+需设置 AKSHARE_DAEMON=1 启用；空闲超过 AKSHARE_DAEMON_IDLE_TIMEOUT 秒自动退出。
+
+安全: socket 放在当前用户独占 (0700) 的目录中，连接前校验 socket 属主，
+同一路径只允许一个常驻服务 (文件锁)，不会删除正在使用的 socket。
+"""
+
+import argparse
+import asyncio
+import fcntl
+import logging
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import time
+
+import anyio
+from mcp.server.stdio import stdio_server
+
+logger = logging.getLogger(__name__)
+
+# 没有会话时自动退出的等待时间 (秒)，0 表示不退出
+IDLE_TIMEOUT = int(os.environ.get('AKSHARE_DAEMON_IDLE_TIMEOUT', '600'))
+
+# 退出码: 另一个常驻服务已持有锁
+EXIT_ALREADY_RUNNING = 0
+# 退出码: 无法启动 (目录不安全、fastmcp 不兼容等)
+EXIT_FAILED = 1
+
+
+def default_socket_path() -> str:
+    """常驻服务 socket 路径，可通过 AKSHARE_SOCKET 覆盖"""
+    env_path = os.environ.get('AKSHARE_SOCKET')
+    if env_path:
+        return env_path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'mcp_akshare', 'daemon.sock')
+    return os.path.join(tempfile.gettempdir(), f'mcp_akshare-{os.getuid()}', 'daemon.sock')
+
+
+def ensure_private_dir(path: str):
+    """创建 socket 所在目录 (0700)，已存在时要求为当前用户独占的真实目录"""
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError(f"socket 目录不安全 (需为当前用户所有且权限 0700): {path}")
+
+
+def socket_trusted(path: str) -> bool:
+    """socket 文件存在且属于当前用户"""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid()
+
+
+def peer_trusted(sock: socket.socket) -> bool:
+    """已连接的对端进程属于当前用户 (Linux SO_PEERCRED，其他平台只依赖属主检查)"""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return True
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', creds)
+    return uid == os.getuid()
+
+
+def _acquire_lock(path: str):
+    """获取 socket 对应的文件锁，已被其他常驻服务持有时返回 None"""
+    fd = os.open(f'{path}.lock', os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _bind(path: str) -> socket.socket:
+    """绑定监听 socket，调用方需持有该路径的文件锁"""
+    # 持有锁说明没有存活的常驻服务，残留的 socket 文件可以安全删除；其他类型的文件不动
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        pass
+    else:
+        if not stat.S_ISSOCK(st.st_mode):
+            raise FileExistsError(f"路径已存在且不是 socket: {path}")
+        os.unlink(path)
+
+    server_sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server_sock.bind(path)
+    os.chmod(path, 0o600)
+    server_sock.listen()
+    server_sock.setblocking(False)
+    return server_sock
+
+
+def _low_level_server():
+    """
+    FastMCP 内部的 MCP 协议服务对象。
+
+    fastmcp 只提供绑定进程 stdin/stdout 的 run_stdio_async，没有在任意流上运行会话的公开接口，
+    这里集中访问其私有属性 _mcp_server，属性不存在时 (fastmcp 版本不兼容) 抛出 RuntimeError。
+    """
+    from .server import mcp
+
+    server = getattr(mcp, '_mcp_server', None)
+    if server is None or not hasattr(server, 'run') or not hasattr(server, 'create_initialization_options'):
+        raise RuntimeError("当前 fastmcp 版本不支持常驻服务模式，请取消 AKSHARE_DAEMON")
+    return server
+
+
+async def _serve_connection(conn: socket.socket, server):
+    """在一个连接上运行完整的 MCP 会话 (换行分隔的 JSON-RPC，与 stdio 相同)"""
+    conn.setblocking(True)
+    with conn, \
+            conn.makefile('r', encoding='utf-8', errors='replace') as rfile, \
+            conn.makefile('w', encoding='utf-8') as wfile:
+        try:
+            async with stdio_server(anyio.wrap_file(rfile), anyio.wrap_file(wfile)) as (read_stream, write_stream):
+                await server.run(
+                    read_stream,
+                    write_stream,
+                    server.create_initialization_options(),
+                )
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            logger.error(f"MCP 会话异常结束: {e}", exc_info=True)
+
+
+async def serve(server_sock: socket.socket, server, idle_timeout: float = IDLE_TIMEOUT):
+    """接受连接，每个连接一个 MCP 会话；没有会话的时间超过 idle_timeout 秒后返回"""
+    loop = asyncio.get_running_loop()
+    active = 0
+    last_active = time.monotonic()
+
+    async def handle(conn):
+        nonlocal active, last_active
+        active += 1
+        try:
+            await _serve_connection(conn, server)
+        finally:
+            active -= 1
+            last_active = time.monotonic()
+
+    async with anyio.create_task_group() as tg:
+        while True:
+            timeout = float('inf')
+            if idle_timeout > 0:
+                # 有会话时也定期醒来，会话结束后才能按空闲时间退出
+                timeout = idle_timeout
+                if active == 0:
+                    timeout -= time.monotonic() - last_active
+                    if timeout <= 0:
+                        logger.info("常驻服务空闲超时，退出")
+                        tg.cancel_scope.cancel()
+                        break
+
+            with anyio.move_on_after(timeout):
+                conn, _ = await loop.sock_accept(server_sock)
+                if peer_trusted(conn):
+                    tg.start_soon(handle, conn)
+                else:
+                    logger.warning("拒绝其他用户的连接")
+                    conn.close()
+
+
+def run(path: str) -> int:
+    """在 path 上运行常驻服务，返回退出码"""
+    if not os.environ.get('AKSHARE_SOCKET'):
+        ensure_private_dir(os.path.dirname(path))
+
+    lock_fd = _acquire_lock(path)
+    if lock_fd is None:
+        logger.info(f"常驻服务已在运行: {path}")
+        return EXIT_ALREADY_RUNNING
+
+    try:
+        server = _low_level_server()
+        server_sock = _bind(path)
+        logger.info(f"MCP AKShare 常驻服务启动: {path}")
+        try:
+            anyio.run(serve, server_sock, server)
+        finally:
+            server_sock.close()
+            # 仍持有锁，删除的一定是自己的 socket
+            if socket_trusted(path):
+                os.unlink(path)
+    finally:
+        os.close(lock_fd)
+    return 0
+
+
+def main():
+    """启动常驻服务"""
+    parser = argparse.ArgumentParser(description="MCP AKShare 常驻服务")
+    parser.add_argument("--socket", default=None, help="Unix socket 路径")
+    args = parser.parse_args()
+
+    try:
+        code = run(args.socket or default_socket_path())
+    except Exception as e:
+        logger.error(f"常驻服务启动失败: {e}")
+        code = EXIT_FAILED
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+测试公共配置
+"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """每个测试使用独立的用户缓存目录，避免磁盘调用缓存在测试间共享"""
+    monkeypatch.setenv("AKSHARE_CACHE_DIR", str(tmp_path / "cache"))
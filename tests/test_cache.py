@@ -0,0 +1,71 @@
+"""
+测试 cache 模块
+"""
+import os
+import time
+
+
+class TestFileCache:
+    """测试 FileCache 类"""
+
+    def test_set_and_get(self, tmp_path):
+        """测试写入后读取，未命中返回默认值"""
+        from src.mcp_akshare.cache import FileCache
+        cache = FileCache(str(tmp_path), ttl=60)
+        assert cache.get("k") is None
+        cache.set("k", {"a": [1, 2]})
+        assert cache.get("k") == {"a": [1, 2]}
+        assert cache.get("other", "default") == "default"
+
+    def test_expired(self, tmp_path, monkeypatch):
+        """测试过期后视为未命中"""
+        from src.mcp_akshare.cache import FileCache
+        cache = FileCache(str(tmp_path), ttl=60)
+        cache.set("k", 1, ttl=10)
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 11)
+        path = cache._path("k")
+        assert cache.get("k") is None
+        # 过期文件读取时删除
+        assert not os.path.exists(path)
+
+    def test_corrupt_file(self, tmp_path):
+        """测试损坏的缓存文件视为未命中"""
+        from src.mcp_akshare.cache import FileCache
+        cache = FileCache(str(tmp_path), ttl=60)
+        cache.set("k", 1)
+        with open(cache._path("k"), "wb") as f:
+            f.write(b"broken")
+        assert cache.get("k") is None
+        assert not os.path.exists(cache._path("k"))
+
+    def test_unpicklable_value(self, tmp_path):
+        """测试无法序列化的值不写入，也不抛异常"""
+        from src.mcp_akshare.cache import FileCache
+        cache = FileCache(str(tmp_path), ttl=60)
+        cache.set("k", lambda: None)
+        assert cache.get("k") is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_max_entries(self, tmp_path):
+        """测试文件数超过上限时删除最早过期的"""
+        from src.mcp_akshare.cache import FileCache
+        cache = FileCache(str(tmp_path), ttl=60, max_entries=2)
+        cache.set("a", 1, ttl=10)
+        cache.set("b", 2, ttl=20)
+        cache.set("c", 3, ttl=30)
+        assert len(list(tmp_path.glob("*.pkl"))) == 2
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+    def test_concurrent_set(self, tmp_path):
+        """测试多个线程同时写入同一键，读到的总是完整的值"""
+        from concurrent.futures import ThreadPoolExecutor
+        from src.mcp_akshare.cache import FileCache
+        cache = FileCache(str(tmp_path), ttl=60)
+        value = list(range(100000))
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: cache.set("k", value), range(32)))
+        assert cache.get("k") == value
+        assert list(tmp_path.glob("*.tmp")) == []
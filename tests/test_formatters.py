@@ -37,6 +37,76 @@ class TestFormatResult:
         assert "warning" in result
         assert result["total_rows"] == 150
 
+    def test_format_dataframe_dates(self):
+        """测试日期列默认原样输出，parse_dates 时转换"""
+        from src.mcp_akshare.formatters import format_result
+        df = pd.DataFrame({"date": ["2024-01-02", "2024-01-03"], "name": ["a", "b"]})
+        result = format_result(df)
+        assert result["data"][0] == {"date": "2024-01-02", "name": "a"}
+
+        result = format_result(df, parse_dates=True)
+        assert result["data"][0]["date"] == "2024-01-02T00:00:00"
+        assert result["data"][0]["name"] == "a"
+        # 不修改原始数据
+        assert df["date"].tolist() == ["2024-01-02", "2024-01-03"]
+
+    def test_format_dataframe_text_not_parsed_as_date(self):
+        """测试不含数字的文本列不会被当作日期"""
+        from src.mcp_akshare.formatters import format_result
+        df = pd.DataFrame({"board": ["A-股", "B-股"]})
+        result = format_result(df, parse_dates=True)
+        assert result["data"] == [{"board": "A-股"}, {"board": "B-股"}]
+
+    def test_format_dataframe_nan_and_duplicate_columns(self):
+        """测试 NaN 转为 None，重复列名也能转换"""
+        from src.mcp_akshare.formatters import format_result
+        df = pd.DataFrame({"a": [1.5, float("nan")], "b": ["x", None]})
+        assert format_result(df)["data"] == [{"a": 1.5, "b": "x"}, {"a": None, "b": None}]
+
+        dup = pd.DataFrame([[1, 2]], columns=["a", "a"])
+        assert len(format_result(dup)["data"]) == 1
+
+    def test_format_dataframe_subsecond(self):
+        """测试时间列保留小数秒"""
+        from src.mcp_akshare.formatters import format_result
+        df = pd.DataFrame({"time": pd.to_datetime(["2024-01-02 09:30:00.123"])})
+        assert format_result(df)["data"] == [{"time": "2024-01-02T09:30:00.123000"}]
+
+    def test_format_dataframe_tz_aware(self):
+        """测试带时区的时间保留原时区，不换算为 UTC"""
+        from src.mcp_akshare.formatters import format_result
+        times = pd.to_datetime(["2024-01-02 09:30", None]).tz_localize("Asia/Shanghai")
+        df = pd.DataFrame({"time": times})
+        assert format_result(df)["data"] == [
+            {"time": "2024-01-02T09:30:00+08:00"},
+            {"time": None},
+        ]
+
+    def test_format_dataframe_date_objects(self):
+        """测试 date 对象只输出日期，不补时间"""
+        from src.mcp_akshare.formatters import format_result
+        df = pd.DataFrame({"日期": [date(2024, 1, 2), None], "close": [10.5, 11.0]})
+        assert format_result(df)["data"] == [
+            {"日期": "2024-01-02", "close": 10.5},
+            {"日期": None, "close": 11.0},
+        ]
+
+        # 与数字混合的 object 列
+        mixed = pd.DataFrame({"日期": [date(2024, 1, 2), 1]})
+        assert format_result(mixed)["data"] == [{"日期": "2024-01-02"}, {"日期": 1}]
+
+    def test_format_max_rows_and_str_len(self):
+        """测试列表按 max_rows 截断，max_str_len 截断长字符串"""
+        from src.mcp_akshare.formatters import format_result
+        result = format_result(list(range(10)), max_rows=3)
+        assert result["data"] == [0, 1, 2]
+        assert result["total_rows"] == 10
+
+        df = pd.DataFrame({"text": ["a" * 20, "b"], "n": [1, 2]})
+        result = format_result(df, max_rows=5, max_str_len=5)
+        assert result["data"] == [{"text": "aaaaa...", "n": 1}, {"text": "b", "n": 2}]
+        assert format_result("abcdef", max_str_len=3) == "abc..."
+
     def test_format_series(self):
         """测试 Series 格式化"""
         from src.mcp_akshare.formatters import format_result
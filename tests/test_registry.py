@@ -54,6 +54,131 @@ class TestDocRegistry:
         results = registry.search("测试")
         assert len(results) > 0
 
+    def test_search_cached(self, temp_docs):
+        """测试重复搜索命中缓存"""
+        from src.mcp_akshare.registry import DocRegistry
+        registry = DocRegistry(temp_docs)
+        registry.initialize()
+        first = registry.search("测试", limit=5)
+        second = registry.search("  测试 ", limit=5)
+        assert first == second
+        assert registry._search_cached.cache_info().hits == 1
+
+    def test_search_automaton_matches_fallback(self, temp_docs):
+        """测试 Aho-Corasick 匹配与子串枚举结果一致"""
+        pytest.importorskip("ahocorasick")
+        from src.mcp_akshare.registry import DocRegistry
+        registry = DocRegistry(temp_docs)
+        registry.initialize()
+        assert registry._automaton is not None
+
+        words = ["测试函数说明", "param1x", "test", "无关"]
+        with_automaton = [registry._match_keywords(w) for w in words]
+        registry._automaton = None
+        assert with_automaton == [registry._match_keywords(w) for w in words]
+
+    def test_match_keywords_long_word(self, temp_docs):
+        """测试未安装自动机时超长查询词的子串匹配不退化为平方复杂度"""
+        import time
+        from src.mcp_akshare.registry import DocRegistry
+        registry = DocRegistry(temp_docs)
+        registry.initialize()
+        registry._automaton = None
+
+        word = "x" * 3000 + "param1" + "y" * 3000
+        start = time.perf_counter()
+        matched = registry._match_keywords(word)
+        assert time.perf_counter() - start < 1
+        assert "param1" in matched
+
+    def test_search_fullwidth(self):
+        """测试全角字符与半角等价，大小写不敏感"""
+        from src.mcp_akshare.registry import DocRegistry
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "stock.md"), "w") as f:
+                f.write("接口: stock_zh_a_spot\n\n描述: Ａ股 实时行情\n")
+            registry = DocRegistry(tmpdir)
+            registry.initialize()
+            assert registry.search("A股")
+            assert registry.search("ａ股 实时")
+            assert registry.search("STOCK_ZH")
+
+    def test_search_batch(self, temp_docs):
+        """测试批量搜索与逐个搜索结果一致"""
+        from src.mcp_akshare.registry import DocRegistry
+        registry = DocRegistry(temp_docs)
+        registry.initialize()
+        queries = ["测试", "测试 param1", "不存在的词"]
+        results = registry.search_batch(queries, limit=5)
+        assert results == [registry.search(q, limit=5) for q in queries]
+        assert len(results[0]) > 0
+        assert results[2] == []
+
+    def test_search_ranked(self):
+        """测试搜索结果按相关度排序，limit 取得分最高的"""
+        from src.mcp_akshare.registry import DocRegistry
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "futures.md"), "w") as f:
+                f.write(
+                    "接口: futures_a\n\n描述: 期货 行情 数据 说明 备注 其他\n\n"
+                    "接口: futures_b\n\n描述: 期货 库存 库存\n\n"
+                    "接口: futures_c\n\n描述: 期货 行情\n"
+                )
+            registry = DocRegistry(tmpdir)
+            registry.initialize()
+            names = [r["full_name"] for r in registry.search("期货 库存")]
+            assert names == ["ak_futures_b"]
+            names = [r["full_name"] for r in registry.search("行情", limit=1)]
+            assert names == ["ak_futures_c"]
+
+    def test_async_search_and_call(self, temp_docs, monkeypatch):
+        """测试 asearch / acall 可并发执行，结果与同步版本一致"""
+        import asyncio
+        import sys
+        import types
+        from src.mcp_akshare.registry import DocRegistry
+
+        fake_ak = types.ModuleType("akshare")
+        fake_ak.test_func = lambda **kwargs: kwargs["param1"]
+        monkeypatch.setitem(sys.modules, "akshare", fake_ak)
+
+        registry = DocRegistry(temp_docs)
+        registry.initialize()
+
+        async def main():
+            return await asyncio.gather(
+                registry.asearch("测试", 5),
+                registry.asearch("param1", 5),
+                registry.acall("test_func", {"param1": "a"}),
+            )
+
+        first, second, called = asyncio.run(main())
+        assert first == registry.search("测试", 5)
+        assert second == registry.search("param1", 5)
+        assert called == "a"
+
+    def test_get_default(self, temp_docs, monkeypatch):
+        """测试默认注册表只初始化一次"""
+        from src.mcp_akshare import registry as registry_module
+        monkeypatch.setattr(registry_module, "registry", registry_module.DocRegistry(temp_docs))
+
+        first = registry_module.get_default()
+        assert first._initialized
+        first.initialize = lambda: pytest.fail("不应重复初始化")
+        assert registry_module.get_default() is first
+
+    def test_default_docs_dir_env_missing(self, tmp_path, monkeypatch, caplog):
+        """测试 AKSHARE_DOCS_DIR 不存在时原样使用并给出警告，不退回自带文档"""
+        from src.mcp_akshare.registry import DocRegistry, _get_default_docs_dir
+        missing = str(tmp_path / "missing")
+        monkeypatch.setenv("AKSHARE_DOCS_DIR", missing)
+        assert _get_default_docs_dir() == missing
+
+        registry = DocRegistry(_get_default_docs_dir())
+        registry.initialize()
+        assert registry.functions == {}
+        assert "文档目录不存在" in caplog.text
+
     def test_list_all(self, temp_docs):
         """测试列出所有函数"""
         from src.mcp_akshare.registry import DocRegistry
@@ -72,6 +197,132 @@ class TestDocRegistry:
         assert "category" in categories[0]
         assert "count" in categories[0]
 
+    def test_parse_params(self):
+        """测试参数表解析 - 描述中含"名称"的参数行不应被当作表头跳过"""
+        from src.mcp_akshare.registry import DocRegistry
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "futures.md"), "w") as f:
+                f.write(
+                    "接口: futures_inventory_em\n\n描述: 库存数据\n\n输入参数\n\n"
+                    "| 名称 | 类型 | 描述 |\n|-----|-----|-----|\n"
+                    "| symbol | str | 品种名称 |\n| date | str | 日期 |\n\n输出参数\n"
+                )
+            registry = DocRegistry(tmpdir)
+            registry.initialize()
+            info = registry.get_function("ak_futures_inventory_em")
+            assert info.params == [
+                {"name": "symbol", "type": "str"},
+                {"name": "date", "type": "str"},
+            ]
+
+    def test_parse_param_row_edge_cases(self):
+        """测试参数行边界情况: 占位行跳过，类型缺失时默认为 string"""
+        from src.mcp_akshare.registry import DocRegistry
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "stock.md"), "w") as f:
+                f.write(
+                    "接口: stock_demo\n\n描述: 示例\n\n输入参数\n\n"
+                    "| 名称 | 类型 | 描述 |\n|----|----|----|\n"
+                    "| -  | -  | -  |\n| adjust |  | 复权 |\n| period\n\n输出参数\n"
+                )
+            registry = DocRegistry(tmpdir)
+            registry.initialize()
+            info = registry.get_function("ak_stock_demo")
+            assert info.params == [
+                {"name": "adjust", "type": "string"},
+                {"name": "period", "type": "string"},
+            ]
+
+    def test_cache_reused_and_invalidated(self, temp_docs):
+        """测试解析缓存命中与失效"""
+        from src.mcp_akshare.registry import DocRegistry
+        registry = DocRegistry(temp_docs)
+        registry.initialize()
+        cache_path = os.path.join(temp_docs, ".registry.cache.pkl")
+        assert os.path.exists(cache_path)
+
+        # 缓存命中: 不再解析文档
+        cached = DocRegistry(temp_docs)
+        cached._parse_all_docs = lambda: pytest.fail("不应重新解析文档")
+        cached.initialize()
+        assert cached.functions.keys() == registry.functions.keys()
+        assert cached.search("测试")
+
+        # 文档变化后缓存失效
+        with open(os.path.join(temp_docs, "test.md"), "a") as f:
+            f.write("\n接口: other_func\n\n描述: 其他函数\n")
+        refreshed = DocRegistry(temp_docs)
+        refreshed.initialize()
+        assert "ak_test_other_func" in refreshed.functions
+
+
+    def test_cache_readonly_docs_dir(self, temp_docs, tmp_path, monkeypatch):
+        """测试文档目录只读时缓存写入用户缓存目录"""
+        from src.mcp_akshare.registry import DocRegistry
+        monkeypatch.setenv("AKSHARE_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(os, "access", lambda path, mode: False)
+        registry = DocRegistry(temp_docs)
+        registry.initialize()
+        assert not os.path.exists(os.path.join(temp_docs, ".registry.cache.pkl"))
+        assert len(list(tmp_path.glob("registry-*.pkl"))) == 1
+
+
+    def test_call_cached(self, temp_docs, monkeypatch):
+        """测试相同调用命中缓存，force_refresh 重新获取"""
+        import sys
+        import types
+        from src.mcp_akshare import registry as registry_module
+        from src.mcp_akshare.registry import DocRegistry
+        monkeypatch.setattr(registry_module, "_FILE_CACHE_TTL", 60)
+
+        calls = []
+        fake_ak = types.ModuleType("akshare")
+        fake_ak.test_func = lambda **kwargs: calls.append(kwargs) or len(calls)
+        monkeypatch.setitem(sys.modules, "akshare", fake_ak)
+
+        registry = DocRegistry(temp_docs)
+        registry.initialize()
+        assert registry.call("test_func", {"param1": "a"}) == 1
+        assert registry.call("ak_test_func", {"param1": "a"}) == 1
+        assert registry.call("test_func", {"param1": "b"}) == 2
+        assert registry.call("test_func", {"param1": "a"}, force_refresh=True) == 3
+        assert len(calls) == 3
+        assert registry._fn_table == {"test_func": fake_ak.test_func}
+
+        # 新实例 (如重启后) 从磁盘缓存读取
+        restarted = DocRegistry(temp_docs)
+        restarted.initialize()
+        assert restarted.call("test_func", {"param1": "a"}) == 3
+        assert len(calls) == 3
+
+    def test_call_cached_returns_copy(self, temp_docs, monkeypatch):
+        """测试修改返回的结果不影响缓存"""
+        import sys
+        import types
+        from src.mcp_akshare.registry import DocRegistry
+
+        fake_ak = types.ModuleType("akshare")
+        fake_ak.test_func = lambda **kwargs: pd.DataFrame({"a": [1, 2]})
+        monkeypatch.setitem(sys.modules, "akshare", fake_ak)
+
+        registry = DocRegistry(temp_docs)
+        registry.initialize()
+        first = registry.call("test_func", {"param1": "a"})
+        first["a"] = 0
+        second = registry.call("test_func", {"param1": "a"})
+        assert second["a"].tolist() == [1, 2]
+        second.drop(columns="a", inplace=True)
+        assert registry.call("test_func", {"param1": "a"})["a"].tolist() == [1, 2]
+
+    def test_file_cache_disabled(self, temp_docs, monkeypatch):
+        """测试磁盘缓存默认关闭，AKSHARE_CACHE_TTL=0 时也关闭"""
+        from src.mcp_akshare import registry as registry_module
+        assert registry_module.DocRegistry(temp_docs)._file_cache is None
+
+        monkeypatch.setattr(registry_module, "_FILE_CACHE_TTL", 60)
+        monkeypatch.setattr(registry_module, "_CALL_CACHE_TTL", 0)
+        assert registry_module.DocRegistry(temp_docs)._file_cache is None
+
 
 class TestExceptions:
     """测试异常类"""
@@ -246,3 +246,97 @@ class TestFunctionInfo:
 
         result = info.to_search_result()
         assert "full_name" in result
+
+
+class TestResponseCache:
+    """测试 ak_call 响应缓存"""
+
+    def test_ak_call_cached(self):
+        """测试相同函数和参数的调用命中缓存"""
+        import pandas as pd
+        from src.mcp_akshare import server
+
+        ak_call = getattr(server.ak_call, "fn", server.ak_call)
+        server._response_cache.clear()
+        df = pd.DataFrame({"a": [1, 2]})
+        with patch.object(server.registry, "call", MagicMock(return_value=df)) as mock_call:
+            first = asyncio.run(ak_call("stock_test", '{"b": 1, "a": 2}'))
+            second = asyncio.run(ak_call("stock_test", '{"a": 2, "b": 1}'))
+        assert first == second
+        assert mock_call.call_count == 1
+        server._response_cache.clear()
+
+    def test_ak_call_force_refresh(self):
+        """测试 force_refresh 跳过响应缓存并传给 registry"""
+        import pandas as pd
+        from src.mcp_akshare import server
+
+        ak_call = getattr(server.ak_call, "fn", server.ak_call)
+        server._response_cache.clear()
+        df = pd.DataFrame({"a": [1, 2]})
+        with patch.object(server.registry, "call", MagicMock(return_value=df)) as mock_call:
+            asyncio.run(ak_call("stock_test", "{}"))
+            asyncio.run(ak_call("stock_test", "{}", force_refresh=True))
+        assert mock_call.call_count == 2
+        assert mock_call.call_args.args == ("stock_test", {}, True)
+        server._response_cache.clear()
+
+    def test_ak_call_max_str_len(self):
+        """测试 max_str_len 截断长字符串，且与不截断的响应分开缓存"""
+        import pandas as pd
+        from src.mcp_akshare import server
+
+        ak_call = getattr(server.ak_call, "fn", server.ak_call)
+        server._response_cache.clear()
+        df = pd.DataFrame({"text": ["a" * 20]})
+        with patch.object(server.registry, "call", MagicMock(return_value=df)):
+            short = json.loads(asyncio.run(ak_call("stock_test", "{}", max_str_len=5)))
+            full = json.loads(asyncio.run(ak_call("stock_test", "{}")))
+        assert short["data"] == [{"text": "aaaaa..."}]
+        assert full["data"] == [{"text": "a" * 20}]
+        server._response_cache.clear()
+
+    def test_ak_call_error_not_cached(self):
+        """测试错误结果不缓存"""
+        from src.mcp_akshare import server
+        from src.mcp_akshare.registry import AkshareError
+
+        ak_call = getattr(server.ak_call, "fn", server.ak_call)
+        server._response_cache.clear()
+        with patch.object(server.registry, "call", MagicMock(side_effect=AkshareError("boom", "f"))) as mock_call:
+            asyncio.run(ak_call("stock_test", "{}"))
+            asyncio.run(ak_call("stock_test", "{}"))
+        assert mock_call.call_count == 2
+
+
+class TestTailLines:
+    """测试日志尾部读取"""
+
+    def test_tail_lines(self, tmp_path):
+        """测试跨块读取最后几行"""
+        from src.mcp_akshare.server import _tail_lines
+
+        log_file = tmp_path / "akshare.log"
+        log_file.write_text("".join(f"第{i}行\n" for i in range(100)), encoding="utf-8")
+        assert _tail_lines(str(log_file), 3, block_size=16) == ["第97行", "第98行", "第99行"]
+        assert len(_tail_lines(str(log_file), 500)) == 100
+
+
+class TestJsonLog:
+    """测试日志 JSON 序列化"""
+
+    def test_json_log_compact(self):
+        """测试日志记录使用紧凑格式且保留中文"""
+        from src.mcp_akshare.server import _JsonLog
+
+        text = str(_JsonLog({"function": "stock_zh_a_spot_em", "params": {"symbol": "螺纹钢"}}))
+        assert text == '{"function":"stock_zh_a_spot_em","params":{"symbol":"螺纹钢"}}'
+
+    def test_big_int(self):
+        """测试超过 64 位的整数退回标准库序列化"""
+        from src.mcp_akshare.server import _JsonLog, _dumps_response
+
+        big = 100000000000000000000
+        assert str(_JsonLog({"params": {"n": big}, "symbol": "螺纹钢"})) == \
+            '{"params":{"n":100000000000000000000},"symbol":"螺纹钢"}'
+        assert json.loads(_dumps_response({"data": [{"n": big}]})) == {"data": [{"n": big}]}
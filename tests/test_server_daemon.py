@@ -0,0 +1,125 @@
+"""
+测试 server_daemon 模块
+"""
+import os
+import socket
+import stat
+
+import anyio
+import pytest
+
+
+class TestSocketPath:
+    """测试 socket 路径"""
+
+    def test_env_override(self, monkeypatch):
+        """测试 AKSHARE_SOCKET 覆盖默认路径"""
+        from src.mcp_akshare.server_daemon import default_socket_path
+        monkeypatch.setenv("AKSHARE_SOCKET", "/tmp/custom.sock")
+        assert default_socket_path() == "/tmp/custom.sock"
+
+    def test_xdg_runtime_dir(self, monkeypatch, tmp_path):
+        """测试使用 XDG_RUNTIME_DIR 下的独立目录"""
+        from src.mcp_akshare.server_daemon import default_socket_path
+        monkeypatch.delenv("AKSHARE_SOCKET", raising=False)
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        assert default_socket_path() == os.path.join(str(tmp_path), "mcp_akshare", "daemon.sock")
+
+    def test_private_dir(self, tmp_path):
+        """测试创建 0700 目录，拒绝其他用户可访问的目录"""
+        from src.mcp_akshare.server_daemon import ensure_private_dir
+        path = str(tmp_path / "run")
+        ensure_private_dir(path)
+        assert stat.S_IMODE(os.lstat(path).st_mode) == 0o700
+        ensure_private_dir(path)
+
+        os.chmod(path, 0o755)
+        with pytest.raises(PermissionError):
+            ensure_private_dir(path)
+
+        link = str(tmp_path / "link")
+        os.chmod(path, 0o700)
+        os.symlink(path, link)
+        with pytest.raises(PermissionError):
+            ensure_private_dir(link)
+
+
+class TestBind:
+    """测试 socket 绑定"""
+
+    def test_lock_exclusive(self, tmp_path):
+        """测试同一路径只能有一个常驻服务持有锁"""
+        from src.mcp_akshare.server_daemon import _acquire_lock
+        path = str(tmp_path / "ak.sock")
+        fd = _acquire_lock(path)
+        assert fd is not None
+        try:
+            assert _acquire_lock(path) is None
+        finally:
+            os.close(fd)
+
+        fd = _acquire_lock(path)
+        assert fd is not None
+        os.close(fd)
+
+    def test_bind_replaces_stale_socket(self, tmp_path):
+        """测试持有锁时清理残留的 socket 文件，新 socket 仅属主可访问且可信"""
+        from src.mcp_akshare.server_daemon import _bind, peer_trusted, socket_trusted
+        path = str(tmp_path / "ak.sock")
+
+        # 残留文件: 无服务监听
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(path)
+        stale.close()
+
+        server_sock = _bind(path)
+        try:
+            assert stat.S_IMODE(os.lstat(path).st_mode) == 0o600
+            assert socket_trusted(path)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(path)
+                assert peer_trusted(client)
+        finally:
+            server_sock.close()
+
+    def test_bind_keeps_regular_file(self, tmp_path):
+        """测试路径上是普通文件时拒绝绑定，不删除该文件"""
+        from src.mcp_akshare.server_daemon import _bind
+        path = tmp_path / "ak.sock"
+        path.write_text("data")
+        with pytest.raises(FileExistsError):
+            _bind(str(path))
+        assert path.read_text() == "data"
+
+    def test_socket_trusted_rejects_non_socket(self, tmp_path):
+        """测试普通文件或不存在的路径不被信任"""
+        from src.mcp_akshare.server_daemon import socket_trusted
+        path = tmp_path / "ak.sock"
+        assert not socket_trusted(str(path))
+        path.write_text("")
+        assert not socket_trusted(str(path))
+
+
+class TestServe:
+    """测试常驻服务运行"""
+
+    def test_low_level_server(self):
+        """测试 fastmcp 提供常驻服务所需的底层服务对象"""
+        from src.mcp_akshare.server_daemon import _low_level_server
+        server = _low_level_server()
+        assert callable(server.run)
+        assert callable(server.create_initialization_options)
+
+    def test_idle_shutdown(self, tmp_path):
+        """测试没有会话时按空闲时间退出"""
+        from src.mcp_akshare.server_daemon import _bind, serve
+        server_sock = _bind(str(tmp_path / "ak.sock"))
+
+        async def main():
+            with anyio.fail_after(5):
+                await serve(server_sock, server=None, idle_timeout=0.1)
+
+        try:
+            anyio.run(main)
+        finally:
+            server_sock.close()